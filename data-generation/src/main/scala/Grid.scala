@@ -58,6 +58,29 @@ object JsonFormats {
     case BurnedGrass           => JsString("-")
     case Thunder               => JsString("TH")
   }
+
+  /** Single byte per cell for the raw stream: the JSON symbol when it is one
+    * character long, otherwise "2"/"3" for the later burning tree stages and
+    * "H" for thunder.
+    */
+  def cellTypeByte(cellType: CellType): Byte = (cellType match {
+    case Water                 => 'W'
+    case Grass                 => 'G'
+    case Tree                  => 'T'
+    case GrowingTree1          => 's'
+    case GrowingTree2          => 'y'
+    case BurningTree1          => '*'
+    case BurningTree2          => '2'
+    case BurningTree3          => '3'
+    case BurningGrass          => '+'
+    case BurningGrowingTree1   => '!'
+    case BurningGrowingTree2_1 => '&'
+    case BurningGrowingTree2_2 => '@'
+    case BurnedTree            => 'A'
+    case BurnedGrass           => '-'
+    case Thunder               => 'H'
+  }).toByte
+
   implicit val vectorStringWrites: Writes[Vector[String]] = Writes { vs =>
     JsArray(vs.map(JsString(_)))
   }
@@ -245,6 +268,17 @@ case class Grid(
       _.map(cell => JsonFormats.cellTypeWrites.writes(cell.cellType).as[String])
     )
 
+  /** Row-major cell bytes, see [[JsonFormats.cellTypeByte]]. */
+  def encodeCellBytes: Array[Byte] = {
+    val bytes = new Array[Byte](width * height)
+    var i = 0
+    for (row <- cells; cell <- row) {
+      bytes(i) = JsonFormats.cellTypeByte(cell.cellType)
+      i += 1
+    }
+    bytes
+  }
+
   /** Main step: fire spread, burning progression, and regrowth. */
   def nextStep(
       enableThunder: Boolean,
@@ -1,6 +1,13 @@
 import JsonFormats._
 import scala.util.{Try, Using, Random}
-import java.io.{FileWriter, PrintWriter}
+import java.io.{
+  BufferedOutputStream,
+  FileOutputStream,
+  OutputStream,
+  PrintWriter
+}
+import java.nio.{ByteBuffer, ByteOrder}
+import java.nio.charset.StandardCharsets
 import play.api.libs.json._
 import scala.io.Source
 
@@ -27,19 +34,42 @@ object Main extends App {
     windStrength
   ) = finalArgs
 
+  // Overridable so that several simulations can run side by side
+  val streamPath =
+    sys.env.getOrElse("SIM_STREAM_PATH", "res/simulation_stream.ndjson")
+  val controlPath =
+    sys.env.getOrElse("SIM_CONTROL_PATH", "res/sim_control.json")
+  // "ndjson" (read by the 3D frontend) or "raw": length-prefixed binary
+  // records with one byte per cell, for consumers that only count cells
+  val rawStream = sys.env.get("SIM_STREAM_FORMAT").contains("raw")
+
   val rand = new Random()
 
-  def writeInitialFiles(grid: Grid): Unit = {
-    Using.resource(new PrintWriter("res/simulation_stream.ndjson")) { out =>
-      val metadata = Json.obj("width" -> width, "height" -> height)
-      out.println(Json.stringify(metadata))
-      out.println(Json.stringify(Json.toJson(grid.encodeCells)))
-    }
+  def openStream(): OutputStream =
+    new BufferedOutputStream(new FileOutputStream(streamPath))
+
+  def writeLine(out: OutputStream, json: JsValue): Unit =
+    out.write((Json.stringify(json) + "\n").getBytes(StandardCharsets.UTF_8))
+
+  /** Raw record: tag byte, little-endian Int32 payload length, payload. */
+  def writeRecord(out: OutputStream, tag: Char, payload: Array[Byte]): Unit = {
+    val header = ByteBuffer.allocate(5).order(ByteOrder.LITTLE_ENDIAN)
+    header.put(tag.toByte).putInt(payload.length)
+    out.write(header.array())
+    out.write(payload)
+  }
+
+  def writeRunStart(out: OutputStream, grid: Grid): Unit = {
+    if (rawStream) {
+      val metadata = ByteBuffer.allocate(8).order(ByteOrder.LITTLE_ENDIAN)
+      writeRecord(out, 'M', metadata.putInt(width).putInt(height).array())
+    } else writeLine(out, Json.obj("width" -> width, "height" -> height))
+    writeFrame(out, grid)
   }
 
   def loadControlState(
       defaults: (Int, Int, Boolean, Int, Int, Boolean)
-  ): (Int, Int, Boolean, Int, Int, Boolean, Boolean, Boolean) = {
+  ): (Int, Int, Boolean, Int, Int, Boolean, Boolean, Boolean, Boolean) = {
     val (
       defaultThunder,
       defaultStepsBetweenThunder,
@@ -49,7 +79,7 @@ object Main extends App {
       defaultWindEnabled
     ) = defaults
     val controlJson = Try(
-      Json.parse(Source.fromFile("res/sim_control.json").mkString)
+      Json.parse(Source.fromFile(controlPath).mkString)
     ).getOrElse(Json.obj())
     (
       (controlJson \ "thunderPercentage").asOpt[Int].getOrElse(defaultThunder),
@@ -65,24 +95,37 @@ object Main extends App {
         .asOpt[Boolean]
         .getOrElse(defaultWindEnabled),
       (controlJson \ "paused").asOpt[Boolean].getOrElse(false),
-      (controlJson \ "step").asOpt[Boolean].getOrElse(false)
+      (controlJson \ "step").asOpt[Boolean].getOrElse(false),
+      (controlJson \ "reset").asOpt[Boolean].getOrElse(false)
     )
   }
 
-  def writeFrame(out: FileWriter, grid: Grid): Unit = {
-    out.write(Json.stringify(Json.toJson(grid.encodeCells)) + "\n")
+  def writeFrame(out: OutputStream, grid: Grid): Unit = {
+    if (rawStream) writeRecord(out, 'F', grid.encodeCellBytes)
+    else writeLine(out, Json.toJson(grid.encodeCells))
     out.flush()
   }
 
   def updateControlJson(controlJson: JsObject): Unit = {
-    Using.resource(new PrintWriter("res/sim_control.json")) { writer =>
+    Using.resource(new PrintWriter(controlPath)) { writer =>
       writer.println(Json.prettyPrint(controlJson))
     }
   }
 
+  def clearControlFlag(flag: String): Unit = {
+    val controlJson = Try(
+      Json.parse(Source.fromFile(controlPath).mkString)
+    ).getOrElse(Json.obj())
+    controlJson match {
+      case obj: JsObject =>
+        updateControlJson(obj + (flag -> JsBoolean(false)))
+      case _ => ()
+    }
+  }
+
   def loop(
       grid: Grid,
-      out: FileWriter,
+      out: OutputStream,
       lastStepSeen: Boolean,
       defaultControl: (Int, Int, Boolean, Int, Int, Boolean),
       stepNum: Int = 0,
@@ -98,7 +141,8 @@ object Main extends App {
       windStrength,
       windEnabled,
       paused,
-      step
+      step,
+      reset
     ) = loadControlState(defaultControl)
     val doStep = step && !lastStepSeen
 
@@ -128,7 +172,15 @@ object Main extends App {
       else
         lastThunderSettings
 
-    if (!paused || doStep) {
+    if (reset) {
+      // Start a fresh run in the same process, announced by a new metadata line
+      clearControlFlag("reset")
+      val newGrid =
+        Grid(width, height, rand).igniteRandomFires(fireTree, fireGrass)
+      writeRunStart(out, newGrid)
+      if (!RUN_FAST) Thread.sleep(100)
+      loop(newGrid, out, step, defaultControl)
+    } else if (!paused || doStep) {
       val nextGrid =
         grid.nextStep(
           thunderEnabledNow,
@@ -140,16 +192,7 @@ object Main extends App {
         )
       writeFrame(out, nextGrid)
 
-      if (doStep) {
-        val controlJson = Try(
-          Json.parse(Source.fromFile("res/sim_control.json").mkString)
-        ).getOrElse(Json.obj())
-        controlJson match {
-          case obj: JsObject =>
-            updateControlJson(obj + ("step" -> JsBoolean(false)))
-          case _ => ()
-        }
-      }
+      if (doStep) clearControlFlag("step")
 
       if (!RUN_FAST) Thread.sleep(100)
       loop(
@@ -179,10 +222,9 @@ object Main extends App {
 
   val initialGrid =
     Grid(width, height, rand).igniteRandomFires(fireTree, fireGrass)
-  writeInitialFiles(initialGrid)
-
-  if (!RUN_FAST) Thread.sleep(100)
-  Using.resource(new FileWriter("res/simulation_stream.ndjson", true)) { out =>
+  Using.resource(openStream()) { out =>
+    writeRunStart(out, initialGrid)
+    if (!RUN_FAST) Thread.sleep(100)
     loop(
       initialGrid,
       out,
@@ -0,0 +1,273 @@
+import subprocess
+import os
+import signal
+import struct
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import numpy as np
+from numba import njit
+
+PARENT_DIR = os.path.abspath("..")
+SIM_CONTROL_TEMPLATE = os.path.join(PARENT_DIR, "res/sim_control_{worker}.json")
+
+# Cell bytes of the simulator's raw stream ("2"/"3" are the "**"/"***" stages)
+burning_symbols = frozenset({"*", "2", "3", "+", "!", "&", "@"})
+burnable_symbols = frozenset({"G", "T", "s", "y"})
+burned_symbols = frozenset({"A", "-"})
+
+# Fixed-shape control file, filled in by `write_sim_control_json`
+CONTROL_TEMPLATE = """{{
+  "thunderPercentage": {thunder},
+  "windAngle": {angle},
+  "windStrength": {strength},
+  "windEnabled": {enabled},
+  "paused": {paused},
+  "step": {step},
+  "reset": {reset}
+}}
+"""
+
+RECORD_HEADER = struct.Struct("<cI")  # Tag byte and payload length
+
+# Metrics returned by `run_one`, in order
+METRICS = ("max_burned", "final_burned", "frames", "peak_fire_front")
+
+# Cell classes, looked up by the byte of a cell
+OTHER, BURNABLE, BURNING, BURNED = range(4)
+CELL_CLASSES = np.zeros(256, dtype=np.uint8)
+CELL_CLASSES[[ord(s) for s in burnable_symbols]] = BURNABLE
+CELL_CLASSES[[ord(s) for s in burning_symbols]] = BURNING
+CELL_CLASSES[[ord(s) for s in burned_symbols]] = BURNED
+
+
+def write_sim_control_json(
+    path,
+    thunder_percentage,
+    wind_angle,
+    wind_strength,
+    wind_enabled,
+    paused=False,
+    step=False,
+    reset=False,
+):
+    control = CONTROL_TEMPLATE.format(
+        thunder=thunder_percentage,
+        angle=wind_angle,
+        strength=wind_strength,
+        enabled=str(wind_enabled).lower(),
+        paused=str(paused).lower(),
+        step=str(step).lower(),
+        reset=str(reset).lower(),
+    )
+    # Swap the file in atomically so the simulator never reads a partial write
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        f.write(control)
+    os.replace(tmp_path, path)
+
+
+def kill_proc_tree(proc):
+    """SIGKILL the simulator's whole process group and reap it."""
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+    except Exception as e:
+        print(f"Could not kill process tree: {e}")
+    proc.wait()
+
+
+def simulator_exited(proc):
+    """Build the error raised when the simulator's stream ends unexpectedly."""
+    try:
+        # The stream closes just before the process exits, give it a moment
+        code = proc.wait(timeout=1)
+    except subprocess.TimeoutExpired:
+        code = None
+    return RuntimeError(f"simulator exited with {code}")
+
+
+def read_records(stream, proc):
+    """Yield the (tag, payload) records of the simulator's raw stream.
+
+    Each record is a tag byte (b"M" metadata, b"F" frame), a little-endian
+    uint32 payload length and the payload; a frame payload holds one byte per
+    cell, row by row. Stops at end of stream, and raises if the stream ends
+    in the middle of a record.
+    """
+    while True:
+        header = stream.read(RECORD_HEADER.size)
+        if not header:
+            return
+        if len(header) < RECORD_HEADER.size:
+            raise simulator_exited(proc)
+        tag, length = RECORD_HEADER.unpack(header)
+        payload = stream.read(length)
+        if len(payload) < length:
+            raise simulator_exited(proc)
+        yield tag, payload
+
+
+@njit(cache=True)
+def count_classes(cells):
+    """Count the cells of each class, indexed by OTHER/BURNABLE/BURNING/BURNED."""
+    counts = np.zeros(4, dtype=np.int64)
+    for cell in cells:
+        counts[CELL_CLASSES[cell]] += 1
+    return counts
+
+
+def start_simulator(cmd, sim_control):
+    """Start a simulator that streams its frames over a dedicated pipe.
+
+    Returns the process and the read end of the pipe. The simulator keeps
+    running across runs: later runs are started by writing a control file
+    with `reset` set.
+    """
+    # A dedicated pipe rather than stdout, where run-sim.sh echoes its arguments
+    read_fd, write_fd = os.pipe()
+    env = {
+        **os.environ,
+        "SIM_STREAM_PATH": f"/dev/fd/{write_fd}",
+        "SIM_STREAM_FORMAT": "raw",
+        "SIM_CONTROL_PATH": sim_control,
+    }
+    try:
+        # Own session, so the script and the JVM it starts share one process group
+        proc = subprocess.Popen(
+            cmd,
+            cwd=PARENT_DIR,
+            env=env,
+            pass_fds=(write_fd,),
+            start_new_session=True,
+        )
+    except Exception:
+        os.close(read_fd)
+        raise
+    finally:
+        # Only the simulator writes, so the stream ends when it exits
+        os.close(write_fd)
+    return proc, os.fdopen(read_fd, "rb")
+
+
+def run_one(proc, stream):
+    """Follow one run of the simulator `proc` on its `stream` until the fire dies out.
+
+    Returns the run's metrics, in the order of `METRICS`.
+    """
+    records = read_records(stream, proc)
+    # Skip frames left over from the previous run, up to this run's metadata
+    for tag, _ in records:
+        if tag == b"M":
+            break
+    else:
+        raise simulator_exited(proc)
+
+    frame_counter = 0
+    max_percent_burned = 0.0
+    peak_fire_front = 0
+    initial_burnable_count = None
+    percent_burned = 0.0  # For reporting in last frame
+
+    for tag, payload in records:
+        if tag != b"F":
+            continue
+        counts = count_classes(np.frombuffer(payload, dtype=np.uint8))
+
+        frame_counter += 1
+        burning_now = int(counts[BURNING])
+        burned = int(counts[BURNED])
+        peak_fire_front = max(peak_fire_front, burning_now)
+
+        # First grid: establish denominator!
+        if initial_burnable_count is None:
+            initial_burnable_count = int(counts[BURNABLE:].sum())
+            if initial_burnable_count == 0:
+                raise RuntimeError("No burnable cells in grid!")
+
+        percent_burned = 100.0 * burned / initial_burnable_count
+        max_percent_burned = max(max_percent_burned, percent_burned)
+        if burning_now == 0:
+            break
+    else:
+        # The stream ended before the fire died out
+        raise simulator_exited(proc)
+
+    return max_percent_burned, percent_burned, frame_counter, peak_fire_front
+
+
+def run_worker(worker, jobs, sim_script, cmd_builder, control):
+    """Run a share of the sweep's (wind strength, repeat) jobs on one simulator.
+
+    Each worker drives its simulator through its own control file, named after
+    the worker's index.
+    """
+    sim_control = SIM_CONTROL_TEMPLATE.format(worker=worker)
+    proc = None
+    results = []
+    try:
+        for wind_strength, run in jobs:
+            write_sim_control_json(
+                sim_control,
+                wind_strength=wind_strength,
+                reset=proc is not None,
+                **control,
+            )
+            if proc is None:
+                cmd = [sim_script, *cmd_builder(wind_strength)]
+                proc, stream = start_simulator(cmd, sim_control)
+            metrics = run_one(proc, stream)
+            _, final_burned, frames, _ = metrics
+            print(
+                f"  Wind {wind_strength}, repeat {run + 1}: "
+                f"Frames: {frames}, Burned: {final_burned:.1f}%"
+            )
+            results.append(metrics)
+    finally:
+        if proc is not None:
+            stream.close()
+            kill_proc_tree(proc)
+        if os.path.exists(sim_control):
+            os.remove(sim_control)
+    return results
+
+
+def run_sweep(
+    sim_script,
+    cmd_builder,
+    wind_strengths,
+    repeats,
+    control,
+    metrics=("max_burned", "final_burned"),
+):
+    """Run every (wind strength, repeat) simulation in parallel.
+
+    `cmd_builder(wind_strength)` returns the arguments passed to `sim_script`;
+    it must be a module-level function so that it can be sent to the pool
+    workers. `control` holds the other `write_sim_control_json` arguments.
+
+    Returns a dict mapping each of `metrics` (names from `METRICS`) to its
+    value per wind strength, averaged over the repeats.
+    """
+    jobs = [(w, run) for w in wind_strengths for run in range(repeats)]
+    n_workers = min(os.cpu_count() or 1, len(jobs))
+    # Interleave the jobs so every worker gets a mix of wind strengths
+    shares = [jobs[i::n_workers] for i in range(n_workers)]
+    # Compile the kernel before the pool starts: forked workers inherit it, and
+    # the on-disk cache is written once instead of raced by every worker
+    count_classes(np.zeros(1, dtype=np.uint8))
+    worker = partial(
+        run_worker, sim_script=sim_script, cmd_builder=cmd_builder, control=control
+    )
+
+    with ProcessPoolExecutor(max_workers=n_workers) as ex:
+        results = list(ex.map(worker, range(n_workers), shares))
+
+    wind_index = {w: i for i, w in enumerate(wind_strengths)}
+    values = np.zeros((len(METRICS), len(wind_strengths), repeats))
+    for share, share_results in zip(shares, results):
+        for (w, run), run_metrics in zip(share, share_results):
+            values[:, wind_index[w], run] = run_metrics
+
+    means = values.mean(axis=2)
+    return {name: means[METRICS.index(name)] for name in metrics}